@@ -1,12 +1,61 @@
-import csv
 import sys
 from pathlib import Path
 from typing import Optional
 
 import typer
 
-from docugami_dfm_benchmarks.utils.scorer import score_by_column, score_by_separate_csvs
-from docugami_dfm_benchmarks.utils.tabulation import OutputFormat, tabulate_scores
+from docugami_dfm_benchmarks.utils.ingest import CsvEngine, arrow_available, read_csv
+from docugami_dfm_benchmarks.utils.metrics import INPUT_EMBEDDINGS, METRICS, get_metrics
+from docugami_dfm_benchmarks.utils.scorer import (
+    KEY_GT,
+    diff_by_column,
+    score_by_column,
+    score_by_separate_csvs,
+    select_scored_columns,
+)
+from docugami_dfm_benchmarks.utils.similarity import EncodeSettings
+from docugami_dfm_benchmarks.utils.tabulation import (
+    OutputFormat,
+    format_row_diffs,
+    tabulate_diff_summary,
+    tabulate_scores,
+)
+
+
+def _validate_metrics(metrics: Optional[list[str]]) -> Optional[list[str]]:
+    try:
+        get_metrics(metrics)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    return metrics
+
+
+METRICS_OPTION = typer.Option(
+    None,
+    "--metrics",
+    callback=_validate_metrics,
+    help=f"Metric to compute, may be repeated. Defaults to all of: {', '.join(METRICS)}",
+)
+
+
+def _validate_csv_engine(csv_engine: CsvEngine) -> CsvEngine:
+    if csv_engine == CsvEngine.ARROW and not arrow_available():
+        raise typer.BadParameter(
+            "pyarrow is not installed, install it with: pip install pyarrow"
+        )
+    return csv_engine
+
+
+CSV_ENGINE_OPTION = typer.Option(CsvEngine.AUTO, callback=_validate_csv_engine)
+
+ENCODE_THREADS_OPTION = typer.Option(
+    None, min=1, help="Intra-op threads for encoding. Defaults to torch's default."
+)
+BATCH_SIZE_OPTION = typer.Option(None, min=1, help="Batch size for encoding.")
+AUTO_TUNE_OPTION = typer.Option(
+    False,
+    help="Calibrate on part of the data to pick the fastest batch size and thread count (unless given explicitly). Skipped for small datasets.",
+)
 
 app = typer.Typer(
     help="Docugami Foundation Model (DFM) Benchmark evaluation scripts",
@@ -14,10 +63,23 @@ app = typer.Typer(
 )
 
 
+def _echo_encode_settings(
+    encode_settings: EncodeSettings, metrics: Optional[list[str]]
+) -> None:
+    """Reports the encoding settings used, if any metric needed embeddings."""
+    if any(INPUT_EMBEDDINGS in metric.requires for metric in get_metrics(metrics)):
+        typer.echo(f"Encoding settings: {encode_settings}")
+
+
 @app.command()
 def eval_by_column(
     csv_file: Path,
     output_format: OutputFormat = OutputFormat.GITHUB_MARKDOWN,
+    metrics: Optional[list[str]] = METRICS_OPTION,
+    csv_engine: CsvEngine = CSV_ENGINE_OPTION,
+    encode_threads: Optional[int] = ENCODE_THREADS_OPTION,
+    batch_size: Optional[int] = BATCH_SIZE_OPTION,
+    auto_tune: bool = AUTO_TUNE_OPTION,
 ) -> None:
     """
     Scores the data in the given input CSV file. Assumes data is in the following format:
@@ -27,17 +89,17 @@ def eval_by_column(
     data_x     |  data_y    | ... |  data_z    | label_x        | label_y     | ... | label_z
     ...
 
-    Ignores the data_col_* values, and looks at the columns to the right of Ground Truth.
+    Ignores the data_col_* values (they are not loaded), and looks at the columns to the right of Ground Truth.
 
     Scores all the model_col_* values to the right of the Ground Truth column against the
     Ground Truth column using a few different metrics.
     """
-    with open(csv_file) as file:
-        reader = csv.DictReader(file)
-        data = [row for row in reader]
-        scores = score_by_column(data)
-        table = tabulate_scores(scores, output_format)
-        typer.echo(table)
+    encode_settings = EncodeSettings(batch_size, encode_threads, auto_tune)
+    data = read_csv(csv_file, select_scored_columns, csv_engine)
+    scores = score_by_column(data, metrics, encode_settings)
+    table = tabulate_scores(scores, output_format)
+    typer.echo(table)
+    _echo_encode_settings(encode_settings, metrics)
 
 
 @app.command()
@@ -46,39 +108,92 @@ def eval_by_csv(
     model_output_csv: Path,
     key_column: Optional[str] = None,
     output_format: OutputFormat = OutputFormat.GITHUB_MARKDOWN,
+    metrics: Optional[list[str]] = METRICS_OPTION,
+    csv_engine: CsvEngine = CSV_ENGINE_OPTION,
+    encode_threads: Optional[int] = ENCODE_THREADS_OPTION,
+    batch_size: Optional[int] = BATCH_SIZE_OPTION,
+    auto_tune: bool = AUTO_TUNE_OPTION,
+) -> None:
+
+    encode_settings = EncodeSettings(batch_size, encode_threads, auto_tune)
+    gt_data = read_csv(ground_truth_csv, engine=csv_engine)
+    model_output_data = read_csv(model_output_csv, engine=csv_engine)
+
+    (
+        scores,
+        ignored_columns_gt,
+        ignored_columns_model,
+        unmatched_gt,
+        unmatched_mo,
+    ) = score_by_separate_csvs(
+        gt_data, model_output_data, key_column, metrics, encode_settings
+    )
+    table = tabulate_scores(scores, output_format)
+    typer.echo(table)
+    _echo_encode_settings(encode_settings, metrics)
+
+    typer.echo(
+        f"Ignored columns in ground truth CSV (no match in model output): {ignored_columns_gt}"
+    )
+    typer.echo(
+        f"Ignored columns in model output CSV (no match in ground truth): {ignored_columns_model}"
+    )
+
+    if key_column:
+        typer.echo(
+            f"{len(unmatched_gt)} rows in ground truth did not have matching rows in model output (based on key column {key_column})"
+        )
+        typer.echo(
+            f"{len(unmatched_mo)} rows in model output did not have matching rows in ground truth (based on key column {key_column})"
+        )
+
+
+@app.command()
+def diff(
+    csv_file: Path,
+    baseline_column: str,
+    candidate_column: str,
+    output_format: OutputFormat = OutputFormat.GITHUB_MARKDOWN,
+    metrics: Optional[list[str]] = METRICS_OPTION,
+    csv_engine: CsvEngine = CSV_ENGINE_OPTION,
+    encode_threads: Optional[int] = ENCODE_THREADS_OPTION,
+    batch_size: Optional[int] = BATCH_SIZE_OPTION,
+    auto_tune: bool = AUTO_TUNE_OPTION,
 ) -> None:
+    """
+    Compares two model output columns in the given input CSV file (same format as eval-by-column)
+    row by row against the Ground Truth column, e.g. before and after swapping a model version.
+
+    Prints the aggregate change in each metric, then lists the rows where any metric changed,
+    highest impact first: rows that flipped between match and miss on the most metrics (exact
+    match, each similarity threshold) come first, then rows with the largest F1 deltas.
+    """
+    encode_settings = EncodeSettings(batch_size, encode_threads, auto_tune)
+    data = read_csv(
+        csv_file,
+        lambda header: [
+            column
+            for column in header
+            if column in (KEY_GT, baseline_column, candidate_column)
+        ],
+        csv_engine,
+    )
+    scores, diffs = diff_by_column(
+        data, baseline_column, candidate_column, metrics, encode_settings
+    )
+
+    typer.echo(
+        tabulate_diff_summary(
+            scores, diffs, baseline_column, candidate_column, output_format
+        )
+    )
+    _echo_encode_settings(encode_settings, metrics)
+    typer.echo(f"{len(diffs)} of {len(data)} rows changed")
 
-    with open(ground_truth_csv, encoding="utf-8-sig") as gt_file:
-        gt_reader = csv.DictReader(gt_file)
-        gt_data = [row for row in gt_reader]
-        with open(model_output_csv, encoding="utf-8-sig") as model_output_file:
-            model_output_reader = csv.DictReader(model_output_file)
-            model_output_data = [row for row in model_output_reader]
-
-            (
-                scores,
-                ignored_columns_gt,
-                ignored_columns_model,
-                unmatched_gt,
-                unmatched_mo,
-            ) = score_by_separate_csvs(gt_data, model_output_data, key_column)
-            table = tabulate_scores(scores, output_format)
-            typer.echo(table)
-
-            typer.echo(
-                f"Ignored columns in ground truth CSV (no match in model output): {ignored_columns_gt}"
-            )
-            typer.echo(
-                f"Ignored columns in model output CSV (no match in ground truth): {ignored_columns_model}"
-            )
-
-            if key_column:
-                typer.echo(
-                    f"{len(unmatched_gt)} rows in ground truth did not have matching rows in model output (based on key column {key_column})"
-                )
-                typer.echo(
-                    f"{len(unmatched_mo)} rows in model output did not have matching rows in ground truth (based on key column {key_column})"
-                )
+    if diffs:
+        typer.echo()
+        for line in format_row_diffs(diffs, output_format):
+            typer.echo(line)
 
 
 def _version_callback(value: bool) -> None:
@@ -0,0 +1,117 @@
+import csv
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Optional
+
+# Large read buffer, since the annotation CSVs are dominated by long quoted multiline
+# context fields and we want to parse them in as few reads as possible.
+READ_BUFFER_SIZE = 1 << 20
+
+# Chooses the columns to keep, given the CSV header
+ColumnSelector = Callable[[list[str]], list[str]]
+
+
+class CsvEngine(str, Enum):
+    AUTO = "auto"
+    PYTHON = "python"
+    ARROW = "arrow"
+
+
+def arrow_available() -> bool:
+    """Whether pyarrow is installed, for CsvEngine.ARROW."""
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _read_header(path: Path) -> list[str]:
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        return next(csv.reader(file), [])
+
+
+def _read_csv_python(
+    path: Path, header: list[str], columns: list[str]
+) -> list[dict[str, str]]:
+    # Same as csv.DictReader, later duplicate column names win
+    indices = {name: i for i, name in enumerate(header)}
+    projection = [(name, indices[name]) for name in columns]
+
+    rows = []
+    with open(
+        path, encoding="utf-8-sig", newline="", buffering=READ_BUFFER_SIZE
+    ) as file:
+        reader = csv.reader(file)
+        next(reader, None)  # skip header
+        for record in reader:
+            if not record:
+                continue  # Same as csv.DictReader, skip blank rows
+            width = len(record)
+            # Only the projected fields are kept, the rest of the record is dropped right away
+            rows.append(
+                {name: record[i] if i < width else "" for name, i in projection}
+            )
+    return rows
+
+
+def _read_csv_arrow(path: Path, columns: list[str]) -> Optional[list[dict[str, str]]]:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    try:
+        table = pa_csv.read_csv(
+            path,
+            read_options=pa_csv.ReadOptions(
+                use_threads=True, block_size=READ_BUFFER_SIZE
+            ),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columns,
+                column_types={name: pa.string() for name in columns},
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+    except pa.ArrowInvalid:
+        # e.g. rows with too few or too many fields, which csv.DictReader accepts
+        return None
+    return table.to_pylist()
+
+
+def read_csv(
+    path: Path,
+    select: Optional[ColumnSelector] = None,
+    engine: CsvEngine = CsvEngine.AUTO,
+) -> list[dict[str, str]]:
+    """
+    Reads the given CSV file into a list of rows (dictionaries keyed by column header),
+    like csv.DictReader but only materializing the columns chosen by select. A UTF-8 BOM,
+    if present, is stripped.
+
+    Parameters:
+    - path: Path to the CSV file.
+    - select: Chooses the columns to keep given the header, or keeps all columns if not specified.
+    - engine: CSV parser to use. AUTO uses the multi-threaded pyarrow reader if installed,
+              falling back to the python csv module otherwise. Files pyarrow cannot parse
+              (e.g. rows with too few or too many fields) are also read with the python csv module.
+
+    Returns:
+    - A list of dictionaries, one per row, with the selected columns as keys.
+    """
+    header = _read_header(path)
+    columns = select(header) if select else header
+
+    if engine == CsvEngine.AUTO:
+        engine = CsvEngine.ARROW if arrow_available() else CsvEngine.PYTHON
+    elif engine == CsvEngine.ARROW and not arrow_available():
+        raise ImportError(
+            "The arrow CSV engine requires pyarrow, install it with: pip install pyarrow"
+        )
+
+    # pyarrow cannot project duplicate column names, the python reader handles those
+    if engine == CsvEngine.ARROW and len(set(header)) == len(header):
+        rows = _read_csv_arrow(path, columns)
+        if rows is not None:
+            return rows
+    return _read_csv_python(path, header, columns)
@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+from docugami_dfm_benchmarks.utils.similarity import SIM_TITLE, f1_from_tokens
+
+# Shared inputs a metric may declare. Normalized text is always available; the others
+# are only computed (once per unique string) when an enabled metric requires them.
+INPUT_TOKENS = "tokens"
+INPUT_EMBEDDINGS = "embeddings"
+
+
+@dataclass
+class MetricInputs:
+    """
+    Row-aligned inputs for scoring one column. Text is already normalized, tokens are
+    populated if any enabled metric requires INPUT_TOKENS, and embeddings are populated
+    if any enabled metric requires INPUT_EMBEDDINGS.
+
+    Embeddings have one unit-length row per text (all zeros for empty text), gathered
+    from the single batched encode. Similarities hold the cosine between GT and model
+    output for each row, NaN where either side is empty.
+    """
+
+    gt: list[str]
+    model: list[str]
+    gt_tokens: Optional[list[list[str]]] = None
+    model_tokens: Optional[list[list[str]]] = None
+    gt_embeddings: Optional[np.ndarray] = None
+    model_embeddings: Optional[np.ndarray] = None
+    similarities: Optional[np.ndarray] = None
+
+
+def _fraction_of_rows(values: np.ndarray, total_rows: int) -> float:
+    return float(values.sum() / total_rows) if total_rows else 0.0
+
+
+def _mean_of_rows(values: np.ndarray, total_rows: int) -> float:
+    return float(values.mean()) if len(values) else 0.0
+
+
+@dataclass(frozen=True)
+class Metric:
+    """
+    A scoring metric. compute() takes the inputs for a whole column and returns one
+    value per row; finalize() reduces those values (given the total number of rows
+    scored) to the single number reported for the column.
+
+    When comparing two columns, pass_fail metrics (whose per-row values are true/false)
+    are reported as flips between pass and fail, other metrics as per-row deltas, and
+    higher_is_better is used to tell improvements from regressions.
+    """
+
+    name: str
+    header: str
+    compute: Callable[[MetricInputs], np.ndarray]
+    finalize: Callable[[np.ndarray, int], float] = _fraction_of_rows
+    requires: frozenset[str] = frozenset()
+    pass_fail: bool = False
+    higher_is_better: bool = True
+
+
+METRICS: dict[str, Metric] = {}
+
+
+def register_metric(metric: Metric) -> Metric:
+    """Adds a metric to the registry. Tabulation follows registration order."""
+    if metric.name in METRICS:
+        raise ValueError(f"Metric already registered: {metric.name}")
+    METRICS[metric.name] = metric
+    return metric
+
+
+def get_metrics(names: Optional[list[str]] = None) -> list[Metric]:
+    """Looks up the given metrics by name (in registry order), or all metrics if none given."""
+    if not names:
+        return list(METRICS.values())
+
+    unknown = [name for name in names if name not in METRICS]
+    if unknown:
+        raise ValueError(
+            f"Unknown metrics {unknown}, expected some of {list(METRICS.keys())}"
+        )
+    return [metric for name, metric in METRICS.items() if name in names]
+
+
+def _exact_match(inputs: MetricInputs) -> np.ndarray:
+    return np.array([gt == mo for gt, mo in zip(inputs.gt, inputs.model)], dtype=bool)
+
+
+def _similarity_at(threshold: float) -> Callable[[MetricInputs], np.ndarray]:
+    def compute(inputs: MetricInputs) -> np.ndarray:
+        assert inputs.similarities is not None  # nosec
+        # NaN (either side empty) compares False, so those rows never count
+        return inputs.similarities >= threshold
+
+    return compute
+
+
+def _f1(inputs: MetricInputs) -> np.ndarray:
+    assert inputs.gt_tokens is not None and inputs.model_tokens is not None  # nosec
+    return np.array(
+        [
+            f1_from_tokens(gt, mo)
+            for gt, mo in zip(inputs.gt_tokens, inputs.model_tokens)
+        ],
+        dtype=float,
+    )
+
+
+def _no_output(inputs: MetricInputs) -> np.ndarray:
+    # Cases where the model output is empty but there is a GT annotation
+    return np.array(
+        [bool(gt) and not mo for gt, mo in zip(inputs.gt, inputs.model)], dtype=bool
+    )
+
+
+register_metric(Metric("exact_match", "Exact Match", _exact_match, pass_fail=True))
+register_metric(
+    Metric(
+        "similarity_0.8",
+        f"{SIM_TITLE} 0.8",
+        _similarity_at(0.8),
+        requires=frozenset({INPUT_EMBEDDINGS}),
+        pass_fail=True,
+    )
+)
+register_metric(
+    Metric(
+        "similarity_0.6",
+        f"{SIM_TITLE} 0.6",
+        _similarity_at(0.6),
+        requires=frozenset({INPUT_EMBEDDINGS}),
+        pass_fail=True,
+    )
+)
+register_metric(
+    Metric(
+        "avg_f1",
+        "Average F1",
+        _f1,
+        finalize=_mean_of_rows,
+        requires=frozenset({INPUT_TOKENS}),
+    )
+)
+register_metric(
+    Metric("no_output", "No Output", _no_output, pass_fail=True, higher_is_better=False)
+)
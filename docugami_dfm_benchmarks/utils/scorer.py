@@ -1,83 +1,153 @@
+from dataclasses import dataclass
 from typing import Any, Optional
 
 import numpy as np
-from tqdm import tqdm
 
-from docugami_dfm_benchmarks.utils.similarity import (
-    SIM_TITLE,
-    compute_f1,
-    semantic_similarity,
+from docugami_dfm_benchmarks.utils.metrics import (
+    INPUT_EMBEDDINGS,
+    INPUT_TOKENS,
+    Metric,
+    MetricInputs,
+    get_metrics,
 )
-from docugami_dfm_benchmarks.utils.text import normalize
+from docugami_dfm_benchmarks.utils.similarity import EncodeSettings, embed_texts
+from docugami_dfm_benchmarks.utils.text import get_tokens, normalize
 
 KEY_GT = "Ground Truth"
 
 
-def _finalize_scores(scores: dict[str, Any], total_rows: int) -> None:
+def select_scored_columns(header: list[str]) -> list[str]:
     """
-    Normalizes scores by the total number of rows and calculates the average F1 score.
-
-    Parameters:
-    - scores: The scores dictionary for a single column.
-    - total_rows: The total number of rows over which scores were computed.
-
-    Modifies the scores dictionary in-place to include normalized metrics and the average F1 score.
+    Selects the Ground Truth column and all model columns to its right from the given CSV
+    header, for use with ingest.read_csv. Keeps all columns if there is no Ground Truth
+    column, so that score_by_column reports the error.
     """
-    avg_f1 = 0
-    for metric in list(scores):
-        if metric == "f1_per_row":
-            avg_f1 = np.mean(scores[metric])
-        else:
-            scores[metric] /= total_rows
-
-    scores["avg_f1"] = avg_f1
+    if KEY_GT not in header:
+        return header
+    return header[header.index(KEY_GT) :]
 
 
-def _initialize_score_structure() -> dict:
-    """Initializes the structure for storing scores."""
-    return {
-        f"{SIM_TITLE}0.8": 0,
-        f"{SIM_TITLE}0.6": 0,
-        "exact_match": 0,
-        "no_output": 0,
-        "f1_per_row": [],
-    }
+def _build_inputs(
+    columns: dict[str, tuple[list[str], list[str]]],
+    metrics: list[Metric],
+    encode_settings: Optional[EncodeSettings] = None,
+) -> dict[str, MetricInputs]:
+    """
+    Builds the shared metric inputs for all columns in one pass. Each unique string
+    (across GT and all model columns) is normalized, tokenized and embedded only once,
+    and only the inputs required by the given metrics are computed.
 
+    Parameters:
+    - columns: Maps column name to its row-aligned (GT annotations, model outputs).
+    - metrics: The metrics that will be run over the inputs.
+    - encode_settings: Batch size and threads for computing embeddings.
 
-def _update_scores(score_struct: dict, gt_annotation: str, model_output: str) -> None:
+    Returns:
+    - A dictionary of MetricInputs for each column.
     """
-    Updates the score structure based on a single row's GT and model output, including semantic similarity.
+    required = set().union(*(metric.requires for metric in metrics))
+
+    normalized: dict[str, str] = {}
+    for gt_annotations, model_outputs in columns.values():
+        for text in gt_annotations + model_outputs:
+            if text not in normalized:
+                normalized[text] = normalize(text)
+
+    unique_texts = set(normalized.values())
+
+    tokens: dict[str, list[str]] = {}
+    if INPUT_TOKENS in required:
+        tokens = {text: get_tokens(text) for text in unique_texts}
+
+    embedding_index: dict[str, int] = {}
+    embeddings = np.zeros((1, 0))
+    if INPUT_EMBEDDINGS in required:
+        to_embed = sorted(text for text in unique_texts if text)
+        if to_embed:
+            embeddings = embed_texts(to_embed, encode_settings)
+            # Empty text maps to an extra all-zeros row at the end
+            embeddings = np.vstack([embeddings, np.zeros(embeddings.shape[1])])
+        embedding_index = {text: i for i, text in enumerate(to_embed)}
+        embedding_index[""] = len(to_embed)
+
+    inputs = {}
+    for column, (gt_annotations, model_outputs) in columns.items():
+        gt = [normalized[text] for text in gt_annotations]
+        mo = [normalized[text] for text in model_outputs]
+        column_inputs = MetricInputs(gt, mo)
+
+        if INPUT_TOKENS in required:
+            column_inputs.gt_tokens = [tokens[text] for text in gt]
+            column_inputs.model_tokens = [tokens[text] for text in mo]
+
+        if INPUT_EMBEDDINGS in required:
+            gt_vectors = embeddings[[embedding_index[text] for text in gt]]
+            mo_vectors = embeddings[[embedding_index[text] for text in mo]]
+            similarities = np.einsum("ij,ij->i", gt_vectors, mo_vectors)
+            # Similarity is only defined if both GT and model outputs are non-empty
+            empty = np.array([not (g and m) for g, m in zip(gt, mo)], dtype=bool)
+            similarities[empty] = np.nan
+            column_inputs.gt_embeddings = gt_vectors
+            column_inputs.model_embeddings = mo_vectors
+            column_inputs.similarities = similarities
+
+        inputs[column] = column_inputs
+
+    return inputs
+
+
+def _finalize_scores(
+    per_row: dict[str, np.ndarray], metrics: list[Metric], total_rows: int
+) -> dict[str, Any]:
     """
-    # Normalize the inputs (Normalization may already be done before this call, depending on the flow)
-    gt_annotation = normalize(gt_annotation)
-    model_output = normalize(model_output)
+    Reduces per-row metric values to the score reported for a single column.
 
-    # Compute F1 score and update
-    score_struct["f1_per_row"].append(compute_f1(gt_annotation, model_output))
+    Parameters:
+    - per_row: Per-row values for each metric, keyed by metric name.
+    - metrics: The metrics to finalize.
+    - total_rows: The total number of rows over which scores were computed.
 
-    # Check for exact matches
-    if gt_annotation == model_output:
-        score_struct["exact_match"] += 1
-    elif not model_output and gt_annotation:
-        # Consider cases where the model output is empty but there is a GT annotation
-        score_struct["no_output"] += 1
+    Returns:
+    - A dictionary of the final score for each metric.
+    """
+    return {
+        metric.name: metric.finalize(per_row[metric.name], total_rows)
+        for metric in metrics
+    }
 
-    # Calculate semantic similarity if both GT and model outputs are non-empty
-    if gt_annotation and model_output:
-        similarity = semantic_similarity(gt_annotation, model_output)
-        if similarity >= 0.8:
-            score_struct[f"{SIM_TITLE}0.8"] += 1
-        if similarity >= 0.6:
-            score_struct[f"{SIM_TITLE}0.6"] += 1
 
+def _score_rows(
+    columns: dict[str, tuple[list[str], list[str]]],
+    metrics: list[Metric],
+    encode_settings: Optional[EncodeSettings] = None,
+) -> dict[str, dict[str, np.ndarray]]:
+    """Runs all the given metrics over the shared inputs for each column, returning per-row values."""
+    inputs = _build_inputs(columns, metrics, encode_settings)
+    return {
+        column: {metric.name: metric.compute(inputs[column]) for metric in metrics}
+        for column in columns
+    }
 
-def _finalize_all_scores(scores: dict, total_matches: int) -> None:
-    """Finalizes all score structures within the scores dict."""
-    for score_struct in scores.values():
-        _finalize_scores(score_struct, total_matches)
+
+def _score_columns(
+    columns: dict[str, tuple[list[str], list[str]]],
+    metrics: list[Metric],
+    total_rows: int,
+    encode_settings: Optional[EncodeSettings] = None,
+) -> dict[str, dict[str, Any]]:
+    """Runs all the given metrics over the shared inputs for each column."""
+    per_row = _score_rows(columns, metrics, encode_settings)
+    return {
+        column: _finalize_scores(values, metrics, total_rows)
+        for column, values in per_row.items()
+    }
 
 
-def score_by_column(data: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+def score_by_column(
+    data: list[dict[str, Any]],
+    metric_names: Optional[list[str]] = None,
+    encode_settings: Optional[EncodeSettings] = None,
+) -> dict[str, dict[str, Any]]:
     """
     Scores the data provided in a single CSV, comparing model outputs directly against
     a ground truth column. Assumes a specific CSV format where one column specifies the
@@ -86,6 +156,9 @@ def score_by_column(data: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
     Parameters:
     - data: List of dictionaries representing rows from the CSV. Each dictionary corresponds to a row,
             with keys as column headers.
+    - metric_names: Names of the metrics to compute (see metrics.METRICS), or all metrics if not specified.
+    - encode_settings: Batch size and threads for computing embeddings. If auto-tuned, the chosen
+                       settings are written back to this object.
 
     Returns:
     - A dictionary of scores for each model output column, including metrics such as similarity thresholds,
@@ -102,31 +175,23 @@ def score_by_column(data: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
 
     # all columns to the right of the GT column are considered models
     model_columns = data_columns[gt_col_index + 1 :]
-    scores = {}
-
-    for column in tqdm(model_columns):
-        gt_annotations = [normalize(row[KEY_GT]) for row in data]
-        model_outputs = [normalize(row[column]) for row in data]
-
-        # Initialize the score structure for this column
-        column_scores = _initialize_score_structure()
-
-        # Update scores for each row
-        for gt_annotation, model_output in zip(gt_annotations, model_outputs):
-            _update_scores(column_scores, gt_annotation, model_output)
-
-        # Finalize scores by calculating average F1 and normalizing metrics
-        _finalize_scores(column_scores, len(data))
-
-        scores[column] = column_scores
+    gt_annotations = [row[KEY_GT] for row in data]
+    columns = {
+        column: (gt_annotations, [row[column] for row in data])
+        for column in model_columns
+    }
 
-    return scores
+    return _score_columns(
+        columns, get_metrics(metric_names), len(data), encode_settings
+    )
 
 
 def score_by_separate_csvs(
     ground_truth_data: list[dict[str, Any]],
     model_output_data: list[dict[str, Any]],
     key_column: Optional[str] = None,
+    metric_names: Optional[list[str]] = None,
+    encode_settings: Optional[EncodeSettings] = None,
 ) -> tuple[dict, list[str], list[str], list[str], list[str]]:
     """
     Scores model output against ground truth data when provided in separate CSVs.
@@ -140,6 +205,10 @@ def score_by_separate_csvs(
     Parameters:
     - ground_truth_data: List of dictionaries representing rows from the ground truth CSV.
     - model_output_data: List of dictionaries representing rows from the model output CSV.
+    - key_column: Optional column used to match rows across the CSVs, instead of by position.
+    - metric_names: Names of the metrics to compute (see metrics.METRICS), or all metrics if not specified.
+    - encode_settings: Batch size and threads for computing embeddings. If auto-tuned, the chosen
+                       settings are written back to this object.
 
     Returns:
     - A dictionary of scores for each common column.
@@ -154,7 +223,7 @@ def score_by_separate_csvs(
         model_columns_normalized.keys()
     )
 
-    scores = {}
+    columns: dict[str, tuple[list[str], list[str]]] = {}
     ignored_columns_gt = set(ground_truth_data[0].keys()) - set(
         gt_columns_normalized[norm] for norm in common_columns_normalized
     )
@@ -189,11 +258,14 @@ def score_by_separate_csvs(
             if original_gt_col in gt_row and original_model_col in mo_row:
                 gt_annotation = gt_row[original_gt_col]
                 model_output = mo_row[original_model_col]
-                if original_gt_col not in scores:
-                    scores[original_gt_col] = _initialize_score_structure()
-                _update_scores(scores[original_gt_col], gt_annotation, model_output)
+                if original_gt_col not in columns:
+                    columns[original_gt_col] = ([], [])
+                columns[original_gt_col][0].append(gt_annotation)
+                columns[original_gt_col][1].append(model_output)
 
-    _finalize_all_scores(scores, len(matched_rows))
+    scores = _score_columns(
+        columns, get_metrics(metric_names), len(matched_rows), encode_settings
+    )
 
     return (
         scores,
@@ -202,3 +274,111 @@ def score_by_separate_csvs(
         sorted(unmatched_gt),
         sorted(unmatched_mo),
     )
+
+
+@dataclass
+class RowDiff:
+    """
+    How a single row's metric values changed from the baseline to the candidate column.
+    Flips hold -1 (pass to fail), 0 or +1 (fail to pass) for each pass_fail metric,
+    and deltas hold candidate minus baseline for every other metric.
+    """
+
+    row: int
+    ground_truth: str
+    baseline: str
+    candidate: str
+    flips: dict[str, int]
+    deltas: dict[str, float]
+
+    @property
+    def impact(self) -> tuple[int, float]:
+        """Number of flipped metrics, then total magnitude of the other deltas."""
+        return (
+            sum(1 for flip in self.flips.values() if flip),
+            sum(abs(delta) for delta in self.deltas.values()),
+        )
+
+
+def diff_by_column(
+    data: list[dict[str, Any]],
+    baseline_column: str,
+    candidate_column: str,
+    metric_names: Optional[list[str]] = None,
+    encode_settings: Optional[EncodeSettings] = None,
+) -> tuple[dict[str, dict[str, Any]], list[RowDiff]]:
+    """
+    Compares two model output columns in a single CSV (same format as score_by_column) row by row.
+    Both columns are scored in one shared pass, so ground truth normalization and embeddings are
+    only computed once.
+
+    Parameters:
+    - data: List of dictionaries representing rows from the CSV.
+    - baseline_column: The model output column to compare against.
+    - candidate_column: The model output column being compared.
+    - metric_names: Names of the metrics to compute (see metrics.METRICS), or all metrics if not specified.
+    - encode_settings: Batch size and threads for computing embeddings.
+
+    Returns:
+    - A dictionary of scores for the baseline and candidate columns, as returned by score_by_column.
+    - The rows where any metric changed, highest impact first.
+    """
+    data_columns = list(data[0].keys())
+    for column in (KEY_GT, baseline_column, candidate_column):
+        if column not in data_columns:
+            raise Exception(
+                f"Column not found, expected {column} in list {data_columns}"
+            )
+    if KEY_GT in (baseline_column, candidate_column):
+        raise Exception(
+            f"Baseline and candidate must be model output columns, not {KEY_GT}"
+        )
+    if baseline_column == candidate_column:
+        raise Exception(
+            f"Baseline and candidate are the same column: {baseline_column}"
+        )
+
+    gt_annotations = [row[KEY_GT] for row in data]
+    columns = {
+        column: (gt_annotations, [row[column] for row in data])
+        for column in (baseline_column, candidate_column)
+    }
+    metrics = get_metrics(metric_names)
+    per_row = _score_rows(columns, metrics, encode_settings)
+    scores = {
+        column: _finalize_scores(values, metrics, len(data))
+        for column, values in per_row.items()
+    }
+
+    before = per_row[baseline_column]
+    after = per_row[candidate_column]
+    flip_metrics = [metric.name for metric in metrics if metric.pass_fail]
+    delta_metrics = [metric.name for metric in metrics if not metric.pass_fail]
+
+    flips = {
+        name: after[name].astype(bool).astype(int)
+        - before[name].astype(bool).astype(int)
+        for name in flip_metrics
+    }
+    deltas = {name: after[name] - before[name] for name in delta_metrics}
+
+    changed = np.zeros(len(data), dtype=bool)
+    for values in flips.values():
+        changed |= values != 0
+    for values in deltas.values():
+        changed |= ~np.isclose(values, 0)
+
+    diffs = [
+        RowDiff(
+            row=int(i),
+            ground_truth=gt_annotations[i],
+            baseline=columns[baseline_column][1][i],
+            candidate=columns[candidate_column][1][i],
+            flips={name: int(values[i]) for name, values in flips.items()},
+            deltas={name: float(values[i]) for name, values in deltas.items()},
+        )
+        for i in np.flatnonzero(changed)
+    ]
+    diffs.sort(key=lambda diff: (-diff.impact[0], -diff.impact[1], diff.row))
+
+    return scores, diffs
@@ -1,5 +1,12 @@
 import collections
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
 
+import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer, util
 from torch.types import Number
 
@@ -7,6 +14,13 @@ from docugami_dfm_benchmarks.utils.text import get_tokens, normalize
 
 SIM_TITLE = "Similarity@>="
 
+DEFAULT_BATCH_SIZE = 32
+CALIBRATION_BATCH_SIZES = (16, 32, 64)
+# Strings encoded per calibration point, enough for several batches of the largest candidate
+CALIBRATION_CHUNK_SIZE = 4 * max(CALIBRATION_BATCH_SIZES)
+CALIBRATION_MAX_FRACTION = 0.5  # of the strings to be encoded, at most
+CALIBRATION_MIN_TEXTS = int(2 * CALIBRATION_CHUNK_SIZE / CALIBRATION_MAX_FRACTION)
+
 _embedding_model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
 
 
@@ -17,9 +31,196 @@ def semantic_similarity(text1: str, text2: str) -> Number:
     return util.pytorch_cos_sim(embedding_1, embedding_2).item()
 
 
+@dataclass
+class EncodeSettings:
+    """
+    Settings for batched encoding. If threads is not set, torch's default intra-op thread
+    count is used. If auto_tune is set, batch size and threads (unless given explicitly)
+    are chosen by tune_encode_settings() on a sample of the strings to be encoded.
+    """
+
+    batch_size: Optional[int] = None
+    threads: Optional[int] = None
+    auto_tune: bool = False
+    strings_per_sec: Optional[float] = None  # measured during calibration, if any
+    auto_tune_note: Optional[str] = (
+        None  # e.g. why calibration was skipped or cut short
+    )
+
+    def __str__(self) -> str:
+        threads = self.threads if self.threads is not None else torch.get_num_threads()
+        batch_size = (
+            self.batch_size if self.batch_size is not None else DEFAULT_BATCH_SIZE
+        )
+        description = (
+            f"batch size {batch_size}, {threads} thread{'s' if threads != 1 else ''}"
+        )
+        if self.strings_per_sec:
+            description += f" (auto-tuned, {self.strings_per_sec:.1f} strings/sec)"
+        if self.auto_tune_note:
+            description += f" ({self.auto_tune_note})"
+        return description
+
+
+def _encode(
+    texts: list[str],
+    batch_size: int,
+    threads: Optional[int],
+    show_progress_bar: bool = False,
+) -> np.ndarray:
+    # torch's thread count is process-wide, so restore it once done
+    previous_threads = torch.get_num_threads()
+    if threads is not None:
+        torch.set_num_threads(threads)
+    try:
+        return _embedding_model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=show_progress_bar,
+        )
+    finally:
+        torch.set_num_threads(previous_threads)
+
+
+def tune_encode_settings(
+    settings: EncodeSettings, texts: list[str]
+) -> dict[int, np.ndarray]:
+    """
+    Runs a short calibration on the given texts to pick the thread count, then the batch size,
+    with the best strings/sec.
+
+    The untuned settings are measured first, and only replaced by settings measured to be
+    faster. From there, each setting is stepped away from its default (threads downwards from
+    torch's default, which is usually all cores, then upwards if that didn't help) until
+    throughput stops improving.
+
+    Every calibration point encodes a different random chunk of the texts, and calibration
+    stops once CALIBRATION_MAX_FRACTION of them have been encoded. The embeddings are returned
+    (keyed by index into texts) so the work is not repeated. With fewer than
+    CALIBRATION_MIN_TEXTS texts nothing is tuned. If calibration is skipped or runs out of
+    budget, auto_tune_note says so.
+
+    Batch size or threads already set on the settings are kept fixed. Modifies the settings
+    in-place and clears auto_tune, so that calibration only runs once.
+    """
+    settings.auto_tune = False
+    if settings.batch_size is not None and settings.threads is not None:
+        return {}
+
+    if len(texts) < CALIBRATION_MIN_TEXTS:
+        settings.auto_tune_note = (
+            f"auto-tune skipped, fewer than {CALIBRATION_MIN_TEXTS} strings to embed"
+        )
+        return {}
+
+    rng = random.Random(0)  # nosec: sampling for calibration, not security
+    order = rng.sample(range(len(texts)), int(len(texts) * CALIBRATION_MAX_FRACTION))
+    embeddings: dict[int, np.ndarray] = {}
+
+    def measure(batch_size: int, threads: int) -> Optional[float]:
+        """Strings/sec encoding the next chunk, or None if the budget is used up."""
+        chunk = order[len(embeddings) : len(embeddings) + CALIBRATION_CHUNK_SIZE]
+        if len(chunk) < CALIBRATION_CHUNK_SIZE:
+            settings.auto_tune_note = "auto-tune cut short by calibration budget"
+            return None
+        start = time.perf_counter()
+        encoded = _encode([texts[i] for i in chunk], batch_size, threads)
+        strings_per_sec = len(chunk) / (time.perf_counter() - start)
+        embeddings.update(zip(chunk, encoded))
+        return strings_per_sec
+
+    def search(
+        candidates: list[int],
+        rate_of: Callable[[int], Optional[float]],
+        best: tuple[float, int],
+    ) -> tuple[float, int]:
+        """
+        Steps from the measured best through smaller candidates, then (if none were faster)
+        larger ones, until throughput stops improving.
+        """
+        best_rate, default = best
+        smaller = sorted((c for c in candidates if c < default), reverse=True)
+        larger = sorted(c for c in candidates if c > default)
+        for direction in (smaller, larger):
+            for candidate in direction:
+                rate = rate_of(candidate)
+                if rate is None or rate <= best[0]:
+                    break
+                best = (rate, candidate)
+            if best[0] > best_rate:
+                break
+        return best
+
+    batch_size = (
+        settings.batch_size if settings.batch_size is not None else DEFAULT_BATCH_SIZE
+    )
+    threads = (
+        settings.threads if settings.threads is not None else torch.get_num_threads()
+    )
+
+    _encode(texts[:8], batch_size, threads)  # warm up
+
+    # Budget is always enough for the first point (see CALIBRATION_MIN_TEXTS)
+    strings_per_sec = measure(batch_size, threads) or 0.0
+
+    if settings.threads is None:
+        cpu_count = os.cpu_count() or 1
+        thread_counts = [2**i for i in range(cpu_count.bit_length())] + [cpu_count]
+        strings_per_sec, threads = search(
+            [count for count in thread_counts if count <= cpu_count],
+            lambda candidate: measure(batch_size, candidate),
+            (strings_per_sec, threads),
+        )
+
+    if settings.batch_size is None:
+        strings_per_sec, batch_size = search(
+            list(CALIBRATION_BATCH_SIZES),
+            lambda candidate: measure(candidate, threads),
+            (strings_per_sec, batch_size),
+        )
+
+    settings.batch_size, settings.threads = batch_size, threads
+    settings.strings_per_sec = strings_per_sec
+    return embeddings
+
+
+def embed_texts(
+    texts: list[str], settings: Optional[EncodeSettings] = None
+) -> np.ndarray:
+    """
+    Embeds the given texts in batches, returning one unit-length row per text so that
+    cosine similarity between two rows reduces to a dot product.
+
+    SentenceTransformer.encode() sorts its input by length before batching, so encoding
+    all texts in one call (rather than one at a time) keeps strings of similar length in
+    the same batch and little compute is spent on padding.
+    """
+    settings = settings or EncodeSettings()
+    embeddings = tune_encode_settings(settings, texts) if settings.auto_tune else {}
+
+    remaining = [i for i in range(len(texts)) if i not in embeddings]
+    encoded = _encode(
+        [texts[i] for i in remaining],
+        settings.batch_size if settings.batch_size is not None else DEFAULT_BATCH_SIZE,
+        settings.threads,
+        show_progress_bar=True,
+    )
+    embeddings.update(zip(remaining, encoded))
+    if not embeddings:
+        return np.empty((0, 0))
+    return np.stack([embeddings[i] for i in range(len(texts))])
+
+
 def compute_f1(text1: str, text2: str) -> float:
     gold_toks = get_tokens(normalize(text1))
     pred_toks = get_tokens(normalize(text2))
+    return f1_from_tokens(gold_toks, pred_toks)
+
+
+def f1_from_tokens(gold_toks: list[str], pred_toks: list[str]) -> float:
+    """Computes token-wise F1 between pre-tokenized ground truth and prediction."""
     common = collections.Counter(gold_toks) & collections.Counter(pred_toks)
     num_same = sum(common.values())
     if len(gold_toks) == 0 or len(pred_toks) == 0:
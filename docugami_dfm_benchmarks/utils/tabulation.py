@@ -1,8 +1,10 @@
 from enum import Enum
+from typing import Iterator
 
 from tabulate import tabulate
 
-from docugami_dfm_benchmarks.utils.similarity import SIM_TITLE
+from docugami_dfm_benchmarks.utils.metrics import METRICS
+from docugami_dfm_benchmarks.utils.scorer import RowDiff
 
 
 class OutputFormat(str, Enum):
@@ -14,28 +16,105 @@ def tabulate_scores(
     scores: dict, output_format: OutputFormat = OutputFormat.GITHUB_MARKDOWN
 ) -> str:
     """Tabulates a set of scores (output of the score() function) into a printable view"""
+    # Only show metrics that were actually scored, in registry order
+    scored = set().union(*(metrics.keys() for metrics in scores.values()))
+    metrics_to_show = [metric for name, metric in METRICS.items() if name in scored]
+
+    headers = ["Column"] + [metric.header for metric in metrics_to_show]
+    table = []
+
+    for model, metrics in scores.items():
+        table.append([model] + [metrics[metric.name] for metric in metrics_to_show])
+
+    return tabulate(
+        table, headers=headers, floatfmt=".2f", tablefmt=output_format.value
+    )
+
+
+def tabulate_diff_summary(
+    scores: dict,
+    diffs: list[RowDiff],
+    baseline_column: str,
+    candidate_column: str,
+    output_format: OutputFormat = OutputFormat.GITHUB_MARKDOWN,
+) -> str:
+    """
+    Tabulates the aggregate change between two columns (output of the diff_by_column() function),
+    with the number of rows that improved or regressed on each metric (taking into account
+    whether higher is better for the metric).
+    """
     headers = [
-        "Column",
-        "Exact Match",
-        f"{SIM_TITLE} 0.8",
-        f"{SIM_TITLE} 0.6",
-        "Average F1",
-        "No Output",
+        "Metric",
+        baseline_column,
+        candidate_column,
+        "Delta",
+        "Improved",
+        "Regressed",
     ]
     table = []
 
-    for model, metrics in scores.items():
+    for name, metric in METRICS.items():
+        if name not in scores[baseline_column]:
+            continue
+        direction = 1 if metric.higher_is_better else -1
+        changes = [
+            direction * (diff.flips[name] if metric.pass_fail else diff.deltas[name])
+            for diff in diffs
+        ]
+        before = scores[baseline_column][name]
+        after = scores[candidate_column][name]
         table.append(
             [
-                model,
-                metrics["exact_match"],
-                metrics[f"{SIM_TITLE}0.8"],
-                metrics[f"{SIM_TITLE}0.6"],
-                metrics["avg_f1"],
-                metrics["no_output"],
+                metric.header,
+                before,
+                after,
+                after - before,
+                sum(1 for change in changes if change > 0),
+                sum(1 for change in changes if change < 0),
             ]
         )
 
     return tabulate(
         table, headers=headers, floatfmt=".2f", tablefmt=output_format.value
     )
+
+
+def _format_line(cells: list[str], output_format: OutputFormat) -> str:
+    # Collapse whitespace, so multiline cells (and tabs) can't break the line apart
+    cells = [" ".join(cell.split()) for cell in cells]
+    if output_format == OutputFormat.TSV:
+        return "\t".join(cells)
+    return "| " + " | ".join(cell.replace("|", "\\|") for cell in cells) + " |"
+
+
+def format_row_diffs(
+    diffs: list[RowDiff], output_format: OutputFormat = OutputFormat.GITHUB_MARKDOWN
+) -> Iterator[str]:
+    """
+    Formats changed rows (output of the diff_by_column() function) one line at a time, so that
+    output for large datasets can be streamed rather than built up as a single table. Flips are
+    shown as + (false to true) or - (true to false), and rows are numbered from 1 in data order.
+    """
+    if not diffs:
+        return
+
+    scored = diffs[0].flips.keys() | diffs[0].deltas.keys()
+    names = [name for name, m in METRICS.items() if name in scored and m.pass_fail]
+    names += [name for name, m in METRICS.items() if name in scored and not m.pass_fail]
+    headers = ["Row"] + [METRICS[name].header for name in names]
+    headers += ["Ground Truth", "Baseline", "Candidate"]
+
+    yield _format_line(headers, output_format)
+    if output_format == OutputFormat.GITHUB_MARKDOWN:
+        yield "|" + "|".join("---" for _ in headers) + "|"
+
+    markers = {1: "+", -1: "-", 0: ""}
+    for diff in diffs:
+        cells = [str(diff.row + 1)]
+        for name in names:
+            if METRICS[name].pass_fail:
+                cells.append(markers[diff.flips[name]])
+            else:
+                cells.append(f"{diff.deltas[name]:+.2f}")
+        cells += [diff.ground_truth, diff.baseline, diff.candidate]
+        yield _format_line(cells, output_format)
@@ -0,0 +1,84 @@
+import csv
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from docugami_dfm_benchmarks.utils import ingest
+from docugami_dfm_benchmarks.utils.ingest import CsvEngine, read_csv
+
+DATA_DIR = Path(__file__).parents[2] / "data" / "annotations"
+
+ENGINES = [
+    CsvEngine.PYTHON,
+    pytest.param(
+        CsvEngine.ARROW,
+        marks=pytest.mark.skipif(
+            importlib.util.find_spec("pyarrow") is None,
+            reason="pyarrow not installed",
+        ),
+    ),
+]
+
+CSV_TEXT = (
+    "Text,Ground Truth,Model A\r\n"
+    '"multiline\r\ncontext, with comma",Start Date,Start Date\r\n'
+    '"more ""quoted""\r\ncontext",Cure Period,\r\n'
+)
+
+
+def _select_from_ground_truth(header: list[str]) -> list[str]:
+    return header[header.index("Ground Truth") :]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_read_csv_projects_columns(tmp_path: Path, engine: CsvEngine) -> None:
+    """Test that only the selected columns are returned, with multiline fields parsed correctly."""
+    path = tmp_path / "data.csv"
+    path.write_bytes(CSV_TEXT.encode("utf-8"))
+    assert read_csv(path, _select_from_ground_truth, engine) == [
+        {"Ground Truth": "Start Date", "Model A": "Start Date"},
+        {"Ground Truth": "Cure Period", "Model A": ""},
+    ]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_read_csv_strips_bom(tmp_path: Path, engine: CsvEngine) -> None:
+    """Test that a UTF-8 BOM does not end up in the first column name."""
+    path = tmp_path / "data.csv"
+    path.write_bytes(CSV_TEXT.encode("utf-8-sig"))
+    rows = read_csv(path, engine=engine)
+    assert list(rows[0].keys()) == ["Text", "Ground Truth", "Model A"]
+    assert rows[1]["Text"] == 'more "quoted"\r\ncontext'
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_read_csv_ragged_rows(tmp_path: Path, engine: CsvEngine) -> None:
+    """Test that rows with too few or too many fields are read like csv.DictReader, padding with empty strings."""
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"a,Ground Truth,M\r\nx,y\r\nx,y,z,w\r\n")
+    assert read_csv(path, engine=engine) == [
+        {"a": "x", "Ground Truth": "y", "M": ""},
+        {"a": "x", "Ground Truth": "y", "M": "z"},
+    ]
+
+
+def test_read_csv_arrow_not_installed(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that asking for the arrow engine without pyarrow installed gives a clear error."""
+    path = tmp_path / "data.csv"
+    path.write_bytes(CSV_TEXT.encode("utf-8"))
+    monkeypatch.setattr(ingest, "arrow_available", lambda: False)
+    with pytest.raises(ImportError, match="pyarrow"):
+        read_csv(path, engine=CsvEngine.ARROW)
+    assert len(read_csv(path)) == 2  # AUTO falls back to the python reader
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_read_csv_matches_dict_reader(engine: CsvEngine) -> None:
+    """Test that the bundled annotation files read the same as with csv.DictReader."""
+    for path in sorted(DATA_DIR.glob("*/*.csv")):
+        with open(path, encoding="utf-8-sig", newline="") as file:
+            expected = [row for row in csv.DictReader(file)]
+        assert read_csv(path, engine=engine) == expected
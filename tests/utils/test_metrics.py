@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from docugami_dfm_benchmarks.utils.metrics import METRICS, MetricInputs, get_metrics
+
+
+def test_get_metrics_defaults_to_all() -> None:
+    """Test that all registered metrics are returned when none are specified."""
+    assert [metric.name for metric in get_metrics()] == list(METRICS.keys())
+
+
+def test_get_metrics_registry_order() -> None:
+    """Test that selected metrics come back in registry order, not request order."""
+    names = [metric.name for metric in get_metrics(["no_output", "exact_match"])]
+    assert names == ["exact_match", "no_output"]
+
+
+def test_get_metrics_unknown() -> None:
+    """Test that unknown metric names are rejected."""
+    with pytest.raises(ValueError):
+        get_metrics(["exact_match", "bleu"])
+
+
+def test_similarity_ignores_empty_rows() -> None:
+    """Test that rows without a similarity (either side empty) never count as a match."""
+    inputs = MetricInputs(
+        gt=["x", "y", "z"],
+        model=["x", "", "w"],
+        similarities=np.array([1.0, np.nan, 0.7]),
+    )
+    assert METRICS["similarity_0.8"].compute(inputs).tolist() == [True, False, False]
+    assert METRICS["similarity_0.6"].compute(inputs).tolist() == [True, False, True]
+
+
+def test_no_output() -> None:
+    """Test that no output is only counted when there is a GT annotation."""
+    inputs = MetricInputs(gt=["x", "", "y"], model=["", "", "y"])
+    assert METRICS["no_output"].compute(inputs).tolist() == [True, False, False]
@@ -1,22 +1,63 @@
 import numpy as np
+import pytest
 
+from docugami_dfm_benchmarks.utils.metrics import (
+    METRICS,
+    Metric,
+    MetricInputs,
+    get_metrics,
+)
 from docugami_dfm_benchmarks.utils.scorer import (
+    _build_inputs,
     _finalize_scores,
+    diff_by_column,
     score_by_column,
     score_by_separate_csvs,
 )
-from docugami_dfm_benchmarks.utils.similarity import SIM_TITLE
 
 
 def test_finalize_scores() -> None:
-    scores = {"exact_match": 2, "no_output": 1, "f1_per_row": np.array([1, 0.5, 0.75])}
+    per_row = {
+        "exact_match": np.array([True, True, False]),
+        "no_output": np.array([False, False, True]),
+        "avg_f1": np.array([1, 0.5, 0.75]),
+    }
     total_rows = 3
-    _finalize_scores(scores, total_rows)
+    scores = _finalize_scores(
+        per_row, get_metrics(["exact_match", "no_output", "avg_f1"]), total_rows
+    )
     assert scores["exact_match"] == 2 / 3
     assert scores["no_output"] == 1 / 3
     assert scores["avg_f1"] == np.mean([1, 0.5, 0.75])
 
 
+def test_build_inputs_embeddings() -> None:
+    columns = {
+        "Model A": (["Start Date", "Cure Period"], ["start date", ""]),
+        "Model B": (["Start Date", "Cure Period"], ["End Date", "Cure Period"]),
+    }
+    inputs = _build_inputs(columns, get_metrics(["similarity_0.8"]))
+
+    for column_inputs in inputs.values():
+        assert column_inputs.gt_embeddings is not None
+        assert column_inputs.model_embeddings is not None
+        assert column_inputs.similarities is not None
+        assert column_inputs.gt_embeddings.shape == column_inputs.model_embeddings.shape
+        # Similarities are the row-wise dot product of the (unit-length) embeddings
+        expected = np.einsum(
+            "ij,ij->i", column_inputs.gt_embeddings, column_inputs.model_embeddings
+        )
+        present = ~np.isnan(column_inputs.similarities)
+        assert np.allclose(column_inputs.similarities[present], expected[present])
+
+    # Empty text gets an all-zeros embedding, and no similarity
+    model_a = inputs["Model A"]
+    assert model_a.model_embeddings is not None and model_a.similarities is not None
+    assert not model_a.model_embeddings[1].any()
+    assert np.isnan(model_a.similarities[1])
+    assert np.isclose(model_a.similarities[0], 1.0)
+
+
 def test_score_by_column() -> None:
     data = [
         {
@@ -35,15 +76,15 @@ def test_score_by_column() -> None:
             "avg_f1": 0.5,
             "exact_match": 0.5,
             "no_output": 0,
-            f"{SIM_TITLE}0.8": 0.5,
-            f"{SIM_TITLE}0.6": 0.5,
+            "similarity_0.8": 0.5,
+            "similarity_0.6": 0.5,
         },
         "Model B": {
             "avg_f1": 0.5,
             "exact_match": 0.5,
             "no_output": 0.5,
-            f"{SIM_TITLE}0.8": 0.5,
-            f"{SIM_TITLE}0.6": 0.5,
+            "similarity_0.8": 0.5,
+            "similarity_0.6": 0.5,
         },
     }
     scores = score_by_column(data)
@@ -54,6 +95,59 @@ def test_score_by_column() -> None:
             )
 
 
+def test_score_by_column_selected_metrics() -> None:
+    data = [
+        {"Ground Truth": "Test sentence.", "Model A": "test sentence"},
+        {"Ground Truth": "Another test.", "Model A": ""},
+    ]
+    scores = score_by_column(data, ["exact_match", "no_output"])
+    assert scores == {"Model A": {"exact_match": 0.5, "no_output": 0.5}}
+
+
+def test_diff_by_column() -> None:
+    data = [
+        {"Ground Truth": "Start Date", "Old": "Start Date", "New": "Start Date"},
+        {"Ground Truth": "Cure Period", "Old": "", "New": "Cure Period"},
+        {"Ground Truth": "Company Name", "Old": "Company Name", "New": "Company"},
+    ]
+    scores, diffs = diff_by_column(
+        data, "Old", "New", ["exact_match", "avg_f1", "no_output"]
+    )
+
+    assert np.isclose(scores["Old"]["exact_match"], 2 / 3)
+    assert np.isclose(scores["New"]["exact_match"], 2 / 3)
+
+    # Unchanged row is left out, and the row that flipped on two metrics comes first
+    assert [diff.row for diff in diffs] == [1, 2]
+    assert diffs[0].flips == {"exact_match": 1, "no_output": -1}
+    assert np.isclose(diffs[0].deltas["avg_f1"], 1.0)
+    assert diffs[1].flips == {"exact_match": -1, "no_output": 0}
+    assert np.isclose(diffs[1].deltas["avg_f1"], 2 / 3 - 1)
+
+
+def test_diff_by_column_pass_fail_int_metric(monkeypatch: pytest.MonkeyPatch) -> None:
+    def has_output(inputs: MetricInputs) -> np.ndarray:
+        return np.array([int(bool(mo)) for mo in inputs.model])
+
+    monkeypatch.setitem(
+        METRICS,
+        "has_output",
+        Metric("has_output", "Has Output", has_output, pass_fail=True),
+    )
+    data = [{"Ground Truth": "Cure Period", "Old": "", "New": "Cure"}]
+    _, diffs = diff_by_column(data, "Old", "New", ["has_output"])
+    assert diffs[0].flips == {"has_output": 1}
+    assert diffs[0].deltas == {}
+
+
+def test_diff_by_column_rejects_ground_truth() -> None:
+    data = [{"Ground Truth": "Start Date", "Old": "Start Date"}]
+    with pytest.raises(Exception, match="Ground Truth"):
+        diff_by_column(data, "Ground Truth", "Old")
+    with pytest.raises(Exception, match="Ground Truth"):
+        diff_by_column(data, "Old", "Ground Truth")
+
+
 def test_score_by_separate_csvs_aligned() -> None:
     ground_truth_data = [
         {
@@ -84,15 +178,15 @@ def test_score_by_separate_csvs_aligned() -> None:
             "avg_f1": 0.9,
             "exact_match": 0.5,
             "no_output": 0,
-            f"{SIM_TITLE}0.8": 1.0,
-            f"{SIM_TITLE}0.6": 1.0,
+            "similarity_0.8": 1.0,
+            "similarity_0.6": 1.0,
         },
         "Column2": {
             "avg_f1": 0.5,  # One exact match, one no_output
             "exact_match": 0.5,
             "no_output": 0.5,
-            f"{SIM_TITLE}0.8": 0.5,
-            f"{SIM_TITLE}0.6": 0.5,
+            "similarity_0.8": 0.5,
+            "similarity_0.6": 0.5,
         },
     }
     scores, ignored_columns_gt, ignored_columns_model, unmatched_gt, unmatched_mo = (
@@ -159,15 +253,15 @@ def test_score_by_separate_csvs_with_key_column() -> None:
             "avg_f1": 0.9,  # Considering matched rows only
             "exact_match": 0.5,
             "no_output": 0,
-            f"{SIM_TITLE}0.8": 1.0,
-            f"{SIM_TITLE}0.6": 1.0,
+            "similarity_0.8": 1.0,
+            "similarity_0.6": 1.0,
         },
         "Column2": {
             "avg_f1": 0.5,  # One exact match, one no_output, considering only matched rows
             "exact_match": 0.5,
             "no_output": 0.5,
-            f"{SIM_TITLE}0.8": 0.5,
-            f"{SIM_TITLE}0.6": 0.5,
+            "similarity_0.8": 0.5,
+            "similarity_0.6": 0.5,
         },
     }
     key_column = "ID"
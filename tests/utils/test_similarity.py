@@ -1,4 +1,19 @@
-from docugami_dfm_benchmarks.utils.similarity import compute_f1
+from typing import Optional
+
+import numpy as np
+import pytest
+import torch
+
+from docugami_dfm_benchmarks.utils import similarity
+from docugami_dfm_benchmarks.utils.similarity import (
+    CALIBRATION_BATCH_SIZES,
+    CALIBRATION_MAX_FRACTION,
+    CALIBRATION_MIN_TEXTS,
+    EncodeSettings,
+    compute_f1,
+    embed_texts,
+    tune_encode_settings,
+)
 
 
 def test_compute_f1_exact_match() -> None:
@@ -52,3 +67,109 @@ def test_compute_f1_with_empty_strings() -> None:
     """
     assert compute_f1("", "") == 1.0  # Both empty, perfect match
     assert compute_f1("quick brown fox", "") == 0.0  # One empty, no match
+
+
+def test_embed_texts_unit_length() -> None:
+    """
+    Test embed_texts returns one unit-length row per text, in input order, regardless of batch size.
+    """
+    texts = ["start date", "a much longer label for the commencement date", "x"]
+    embeddings = embed_texts(texts, EncodeSettings(batch_size=2))
+    assert embeddings.shape[0] == len(texts)
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0, atol=1e-5)
+    assert np.allclose(embeddings, embed_texts(texts), atol=1e-5)
+
+
+def test_tune_encode_settings_skips_small_datasets() -> None:
+    """
+    Test auto-tuning is skipped (and not retried) when there are too few texts to calibrate on.
+    """
+    settings = EncodeSettings(auto_tune=True)
+    assert tune_encode_settings(settings, ["start date", "end date"]) == {}
+    assert settings.batch_size is None and settings.threads is None
+    assert not settings.auto_tune
+    assert settings.auto_tune_note and "skipped" in str(settings)
+
+
+def test_tune_encode_settings_keeps_explicit_values() -> None:
+    """
+    Test auto-tuning only searches the settings not given explicitly, encodes at most
+    CALIBRATION_MAX_FRACTION of the texts, and returns those embeddings for reuse.
+    """
+    texts = [f"label number {i}" for i in range(CALIBRATION_MIN_TEXTS)]
+    settings = EncodeSettings(threads=1, auto_tune=True)
+    embeddings = tune_encode_settings(settings, texts)
+    assert settings.threads == 1
+    assert settings.batch_size in CALIBRATION_BATCH_SIZES
+    assert settings.strings_per_sec and settings.strings_per_sec > 0
+    assert not settings.auto_tune
+    assert 0 < len(embeddings) <= len(texts) * CALIBRATION_MAX_FRACTION
+
+
+def _simulate_scaling_encoder(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Simulates a 32-core host where throughput scales with threads and does not depend on
+    batch size, using a fake clock so no real encoding or waiting happens.
+    """
+    clock = [0.0]
+
+    def fake_encode(
+        texts: list[str],
+        batch_size: int,
+        threads: Optional[int],
+        show_progress_bar: bool = False,
+    ) -> np.ndarray:
+        clock[0] += len(texts) / (threads or 32)
+        return np.zeros((len(texts), 4))
+
+    monkeypatch.setattr(similarity, "_encode", fake_encode)
+    monkeypatch.setattr(similarity.time, "perf_counter", lambda: clock[0])
+    monkeypatch.setattr(similarity.os, "cpu_count", lambda: 32)
+    monkeypatch.setattr(similarity.torch, "get_num_threads", lambda: 32)
+
+
+def test_tune_encode_settings_keeps_faster_default(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test auto-tuning keeps the default (all cores) when fewer threads are slower, on a
+    dataset the size of the bundled ones.
+    """
+    _simulate_scaling_encoder(monkeypatch)
+    settings = EncodeSettings(auto_tune=True)
+    tune_encode_settings(settings, [f"label {i}" for i in range(1404)])
+    assert settings.threads == 32
+    assert settings.batch_size == similarity.DEFAULT_BATCH_SIZE
+
+
+def test_tune_encode_settings_reports_cut_short(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test running out of calibration budget is reported, and keeps measured settings."""
+    _simulate_scaling_encoder(monkeypatch)
+    settings = EncodeSettings(auto_tune=True)
+    tune_encode_settings(settings, [f"label {i}" for i in range(CALIBRATION_MIN_TEXTS)])
+    assert settings.threads == 32
+    assert settings.auto_tune_note and "cut short" in str(settings)
+
+
+def test_encode_restores_threads() -> None:
+    """Test encoding with an explicit thread count leaves torch's thread count as it was."""
+    threads = torch.get_num_threads()
+    embed_texts(["start date"], EncodeSettings(threads=threads + 1))
+    assert torch.get_num_threads() == threads
+
+
+def test_embed_texts_auto_tune_reuses_calibration() -> None:
+    """
+    Test embed_texts returns the same embeddings, in input order, with auto-tuning on.
+    """
+    texts = [f"label number {i}" for i in range(CALIBRATION_MIN_TEXTS)]
+    tuned = embed_texts(texts, EncodeSettings(threads=1, auto_tune=True))
+    assert np.allclose(tuned, embed_texts(texts), atol=1e-5)
+
+
+def test_encode_settings_str() -> None:
+    """Test the reported settings read naturally."""
+    assert str(EncodeSettings(batch_size=8, threads=1)) == "batch size 8, 1 thread"
+    assert str(EncodeSettings(batch_size=8, threads=4)) == "batch size 8, 4 threads"
@@ -0,0 +1,85 @@
+from docugami_dfm_benchmarks.utils.scorer import RowDiff
+from docugami_dfm_benchmarks.utils.tabulation import (
+    OutputFormat,
+    format_row_diffs,
+    tabulate_diff_summary,
+)
+
+
+def _row_diff(
+    row: int,
+    exact_match: int,
+    no_output: int,
+    f1_delta: float,
+    ground_truth: str = "Start Date",
+    baseline: str = "",
+    candidate: str = "Start Date",
+) -> RowDiff:
+    return RowDiff(
+        row=row,
+        ground_truth=ground_truth,
+        baseline=baseline,
+        candidate=candidate,
+        flips={"exact_match": exact_match, "no_output": no_output},
+        deltas={"avg_f1": f1_delta},
+    )
+
+
+def test_tabulate_diff_summary_higher_is_better() -> None:
+    """
+    Test improved/regressed counts, where fewer No Output rows counts as an improvement.
+    """
+    scores = {
+        "Old": {"exact_match": 0.5, "avg_f1": 0.5, "no_output": 0.5},
+        "New": {"exact_match": 0.5, "avg_f1": 0.6, "no_output": 0.0},
+    }
+    diffs = [
+        _row_diff(0, exact_match=1, no_output=-1, f1_delta=1.0),
+        _row_diff(1, exact_match=-1, no_output=0, f1_delta=-0.5),
+    ]
+    table = tabulate_diff_summary(scores, diffs, "Old", "New", OutputFormat.TSV)
+    lines = [line.split("\t") for line in table.splitlines()]
+    rows = {cells[0].strip(): [cell.strip() for cell in cells[1:]] for cells in lines}
+
+    assert rows["Metric"] == ["Old", "New", "Delta", "Improved", "Regressed"]
+    assert rows["Exact Match"] == ["0.50", "0.50", "0.00", "1", "1"]
+    assert rows["Average F1"] == ["0.50", "0.60", "0.10", "1", "1"]
+    assert rows["No Output"] == ["0.50", "0.00", "-0.50", "1", "0"]
+
+
+def test_format_row_diffs_markdown() -> None:
+    """Test markdown output escapes pipes and collapses multiline cells onto one line."""
+    diffs = [
+        _row_diff(
+            2, exact_match=1, no_output=-1, f1_delta=1.0, ground_truth="Rent |\n Due"
+        )
+    ]
+    lines = list(format_row_diffs(diffs, OutputFormat.GITHUB_MARKDOWN))
+    assert lines == [
+        "| Row | Exact Match | No Output | Average F1 | Ground Truth | Baseline | Candidate |",
+        "|---|---|---|---|---|---|---|",
+        "| 3 | + | - | +1.00 | Rent \\| Due |  | Start Date |",
+    ]
+
+
+def test_format_row_diffs_tsv() -> None:
+    """Test TSV output writes quotes as-is and keeps each row on one line."""
+    diffs = [
+        _row_diff(
+            0,
+            exact_match=-1,
+            no_output=0,
+            f1_delta=-0.5,
+            ground_truth='"January 1, 2017"',
+            baseline="Start\tDate",
+            candidate="Start\r\nDate",
+        )
+    ]
+    lines = list(format_row_diffs(diffs, OutputFormat.TSV))
+    assert lines[1:] == ['1\t-\t\t-0.50\t"January 1, 2017"\tStart Date\tStart Date']
+
+
+def test_format_row_diffs_empty() -> None:
+    """Test nothing is output, not even a header, when no rows changed."""
+    assert list(format_row_diffs([], OutputFormat.GITHUB_MARKDOWN)) == []
+    assert list(format_row_diffs([], OutputFormat.TSV)) == []